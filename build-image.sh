@@ -4,6 +4,8 @@
 # =============================================================================
 #
 # This script builds a pre-built Docker image with your agent installed.
+# It renders my_agent/templates/install.sh.j2 into .build/install.sh and
+# runs it during the image build.
 #
 # USAGE:
 #   ./build-image.sh                    # Build with default name
@@ -36,6 +38,33 @@ echo ""
 # Get script directory
 SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
 
+# Render the install script from the same template Harbor uses in setup()
+BUILD_DIR="$SCRIPT_DIR/.build"
+mkdir -p "$BUILD_DIR"
+
+if ! PYTHONPATH="$SCRIPT_DIR:$PYTHONPATH" python3 -c "import my_agent" 2>/dev/null; then
+    echo "ERROR: Cannot import 'my_agent' module"
+    echo ""
+    echo "Rendering install.sh needs Harbor installed in this Python:"
+    echo "  uv pip install harbor"
+    exit 1
+fi
+
+echo "Rendering install.sh from my_agent/templates/install.sh.j2..."
+PYTHONPATH="$SCRIPT_DIR:$PYTHONPATH" python3 - "$BUILD_DIR/install.sh" <<'PY'
+import sys
+import tempfile
+from pathlib import Path
+
+from jinja2 import Template
+from my_agent import MyAgent
+
+agent = MyAgent(logs_dir=Path(tempfile.mkdtemp()))
+template = Template(agent._install_agent_template_path.read_text())
+Path(sys.argv[1]).write_text(template.render(**agent._template_variables))
+PY
+echo ""
+
 # Build the image
 # Use --platform for Apple Silicon Macs (Terminal-Bench runs on linux/amd64)
 if [[ "$(uname -m)" == "arm64" ]]; then
@@ -14,14 +14,140 @@ QUICK START:
 For detailed documentation, see README.md
 """
 
+import io
 import os
-import base64
+import asyncio
+import functools
+import mmap
+import re
+import stat
+import tarfile
+import tempfile
+from binascii import b2a_base64
 from pathlib import Path
 from harbor.agents.installed.base import BaseInstalledAgent, ExecInput
 from harbor.environments.base import BaseEnvironment
 from harbor.models.agent.context import AgentContext
 
 
+# =============================================================================
+# RUNNER SCRIPTS - Installed once per container during setup()
+# =============================================================================
+#
+# run-agent.sh reads the task instruction from a file and hands it to
+# run-agent.exp. Both are static, so each task only sends its instruction.
+#
+# Usage: AGENT=<agent_bin> run-agent.sh <instruction_file>
+
+_RUNNER_SCRIPT = r'''#!/bin/bash
+# Read the task instruction (not echoed, so the log holds only agent
+# output and populate_context_post_run() scans the same thing on both paths)
+INSTRUCTION=$(cat "$1")
+
+cd /app
+
+# Run the expect script (installed next to this one)
+"$(dirname "$0")/run-agent.exp" "$AGENT" "$INSTRUCTION" 2>&1
+EXIT_CODE=$?
+
+echo "=== Agent exited with code: $EXIT_CODE ==="
+exit $EXIT_CODE
+'''
+
+# Many AI agents have interactive prompts. Use 'expect' to:
+# - Provide a pseudo-terminal (PTY)
+# - Auto-accept confirmation prompts
+# - Detect task completion
+# - Handle timeouts gracefully
+#
+# Usage: run-agent.exp <agent_bin> <instruction>
+
+_EXPECT_SCRIPT = r'''#!/usr/bin/expect -f
+
+# Set timeout (25 minutes - adjust as needed)
+set timeout 1500
+log_user 1
+
+# Get arguments passed to this script
+set agent_bin [lindex $argv 0]
+set instruction [lindex $argv 1]
+
+# Track completion
+set task_done 0
+
+# Start the agent
+spawn $agent_bin "$instruction"
+
+# Main interaction loop
+expect {
+    # Prompts and completion messages share one pattern so the output is
+    # scanned once per read; dispatch on whatever matched
+    -re {\[Y/n\]|\[y/N\]|\(yes/no\)|1\. (?:Yes|Continue|Accept)|Done|Completed|Finished|Success} {
+        switch -regexp -- $expect_out(0,string) {
+            {^1\. } {
+                # Auto-accept numbered choice prompts (select first option)
+                send "\r"
+            }
+            {^(?:Done|Completed|Finished|Success)$} {
+                # Detect completion messages; the eof arm below then waits
+                # for the agent to actually exit
+                set task_done 1
+                send "\x03"
+            }
+            default {
+                # Auto-accept "yes/no" prompts
+                send "y\r"
+            }
+        }
+        exp_continue
+    }
+
+    # Handle end of output
+    eof {
+        catch wait result
+        set exit_code [lindex $result 3]
+        if {$task_done} {
+            exit 0
+        }
+        exit $exit_code
+    }
+
+    # Handle timeout
+    timeout {
+        puts "\n=== Timeout ==="
+        if {$task_done} {
+            exit 0
+        }
+        exit 124
+    }
+}
+'''
+
+
+def _build_runner_tarball() -> bytes:
+    """
+    Pack the runner scripts into a gzipped tar archive with the executable
+    bit set, so installing them needs no separate chmod. Compression also
+    strips the 10 KiB record padding of a plain tar.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+        for name, content in (("run-agent.sh", _RUNNER_SCRIPT), ("run-agent.exp", _EXPECT_SCRIPT)):
+            data = content.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mode = 0o755
+            tar.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+# Built and encoded once at import time
+_RUNNER_TARBALL_B64 = b2a_base64(_build_runner_tarball(), newline=False).decode("ascii")
+
+# Scanned for in the agent output by populate_context_post_run()
+_ERROR_PATTERN = re.compile(rb"error", re.IGNORECASE)
+
+
 class MyAgent(BaseInstalledAgent):
     """
     Template agent for Terminal-Bench 2.0.
@@ -33,6 +159,7 @@ class MyAgent(BaseInstalledAgent):
 
     CUSTOMIZATION POINTS:
     - HOST_CONFIG_DIR: Where your agent stores its local config (API keys, etc.)
+    - INTERACTIVE: Whether your agent needs a PTY (run through expect)
     - _install_agent_template_path: Path to your installation script template
     - setup(): Custom initialization logic
     - create_run_agent_commands(): How to invoke your agent with a task
@@ -54,6 +181,57 @@ class MyAgent(BaseInstalledAgent):
     # Where to upload the config inside the container
     CONTAINER_CONFIG_DIR = "/root/.my_agent"
 
+    # Reuse one container for several tasks: when the same environment is
+    # passed to setup() again, skip install and uploads since the agent and
+    # runner scripts are already in place. Harbor starts a fresh container
+    # per trial by default, so this only helps harnesses that reuse one.
+    SESSION_MODE = True
+
+    # Whether your agent needs a PTY to answer interactive prompts. When
+    # False, tasks exec the agent directly with --auto (no expect, no PTY)
+    # and setup() skips installing the runner scripts. Set to True for
+    # agents that stop to ask questions.
+    INTERACTIVE = False
+
+    # Where the runner scripts (run-agent.sh, run-agent.exp) are installed
+    # inside the container
+    RUNNER_DIR = "/usr/local/bin"
+
+    # Where each task's raw instruction is written inside the container
+    INSTRUCTION_FILE = "/tmp/instruction.txt"
+
+    # Per-task command: write the raw instruction to INSTRUCTION_FILE with a
+    # quoted heredoc (no shell expansion inside), then invoke the runner
+    _CMD_TEMPLATE = (
+        "cat > {instruction_file} << '{delimiter}'\n"
+        "{instruction}\n"
+        "{delimiter}\n"
+        "AGENT='{agent}' {runner_dir}/run-agent.sh {instruction_file}"
+    )
+
+    # Per-task command when INTERACTIVE is False: same instruction file, but
+    # the agent replaces the shell directly. stderr is merged into stdout, as
+    # run-agent.sh does, so both paths produce the same log
+    _DIRECT_CMD_TEMPLATE = (
+        "cat > {instruction_file} << '{delimiter}'\n"
+        "{instruction}\n"
+        "{delimiter}\n"
+        "cd /app\n"
+        "exec '{agent}' --auto \"$(cat {instruction_file})\" 2>&1"
+    )
+
+    # Config archives up to this size (base64 bytes) are sent inline with a
+    # single exec call; anything larger is uploaded as a file
+    MAX_INLINE_UPLOAD_BYTES = 96 * 1024
+
+    # Where your installer may put the agent binary (checked in order,
+    # before falling back to 'which my-agent')
+    AGENT_SEARCH_PATHS = [
+        "/usr/bin/my-agent",
+        "/usr/local/bin/my-agent",
+        "/root/.local/bin/my-agent",
+    ]
+
     # =========================================================================
     # REQUIRED METHODS - Implement these for your agent
     # =========================================================================
@@ -68,6 +246,10 @@ class MyAgent(BaseInstalledAgent):
         super().__init__(logs_dir, *args, **kwargs)
         # Add any custom initialization here
         self._agent_path = None  # Will be set during setup
+        # Environments already set up by this agent (SESSION_MODE), keyed by
+        # id() and mapped to (environment, agent path); holding the environment
+        # keeps its id from being reused by a new object
+        self._configured_envs: dict[int, tuple[BaseEnvironment, str]] = {}
 
     @classmethod
     def name(cls) -> str:
@@ -106,15 +288,28 @@ class MyAgent(BaseInstalledAgent):
         """
         Variables to pass to your install.sh.j2 template.
 
-        Example:
-            return {
-                "node_version": "20",
-                "agent_package": "my-agent-cli",
-            }
-
         These can be used in the template as {{ node_version }}, {{ agent_package }}, etc.
+
+        Keep versions pinned here: the rendered script is also baked into the
+        prebuilt image (see build-image.sh), and pinned values keep its
+        install layer cached across rebuilds.
+        """
+        return {
+            "node_version": "20",
+            "agent_package": "my-agent-cli",
+            "agent_version": self.version(),
+        }
+
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _config_exists(cls) -> bool:
+        """
+        Whether HOST_CONFIG_DIR exists on the host.
+
+        Checked once per process rather than once per task, so restart the
+        run if you create the directory while it is in progress.
         """
-        return {}
+        return cls.HOST_CONFIG_DIR.exists()
 
     # =========================================================================
     # SETUP PHASE - Called once when container starts
@@ -143,19 +338,20 @@ class MyAgent(BaseInstalledAgent):
         - Print diagnostic info to help debug failures
         """
 
+        if self.SESSION_MODE and id(environment) in self._configured_envs:
+            _, self._agent_path = self._configured_envs[id(environment)]
+            print(f"Container already set up, reusing agent at: {self._agent_path}")
+            return
+
         # ---------------------------------------------------------------------
         # Step 1: Check if agent is already installed (for prebuilt images)
         # ---------------------------------------------------------------------
         # This optimization skips installation if using a prebuilt Docker image
         # that already has your agent installed.
 
-        check_result = await environment.exec(command="which my-agent || echo 'NOT_FOUND'")
-        stdout = check_result.stdout.strip()
-
-        agent_exists = stdout.startswith("/") and "NOT_FOUND" not in stdout
+        self._agent_path = await self._locate_agent(environment)
 
-        if agent_exists:
-            self._agent_path = stdout
+        if self._agent_path:
             print(f"Agent already installed at: {self._agent_path}")
         else:
             # Run the installation script from the template
@@ -163,45 +359,39 @@ class MyAgent(BaseInstalledAgent):
             await super().setup(environment)
 
             # Find where the agent was installed
-            # Try common installation paths
-            possible_paths = [
-                "/usr/bin/my-agent",
-                "/usr/local/bin/my-agent",
-                "/root/.local/bin/my-agent",
-            ]
-
-            for path in possible_paths:
-                check = await environment.exec(command=f"test -x {path} && echo 'EXISTS'")
-                if "EXISTS" in check.stdout:
-                    self._agent_path = path
-                    print(f"Agent found at: {self._agent_path}")
-                    break
+            self._agent_path = await self._locate_agent(environment)
+            if self._agent_path:
+                print(f"Agent found at: {self._agent_path}")
             else:
-                # Fallback: use 'which' to find it
-                result = await environment.exec(command="which my-agent || echo 'NOT_FOUND'")
-                if result.stdout.strip().startswith("/"):
-                    self._agent_path = result.stdout.strip()
-                else:
-                    print("WARNING: Could not find agent binary, using default path")
-                    self._agent_path = "/usr/local/bin/my-agent"
+                print("WARNING: Could not find agent binary, using default path")
+                self._agent_path = "/usr/local/bin/my-agent"
 
         # ---------------------------------------------------------------------
-        # Step 2: Upload authentication/configuration files
+        # Step 2: Upload files and verify installation
         # ---------------------------------------------------------------------
+        # The runner scripts are the same for every task, so write them once
+        # here instead of re-sending them with each task command (interactive
+        # agents only).
+        #
         # Most agents need API keys, OAuth tokens, or other credentials.
         # Upload your local config directory to the container.
+        #
+        # Finally, run a quick test to make sure everything is working. The
+        # version check does not read the uploaded config (move it after the
+        # gather if your CLI does), so all three steps run concurrently.
 
-        if self.HOST_CONFIG_DIR.exists():
-            print(f"Uploading config from {self.HOST_CONFIG_DIR}")
+        version_check = environment.exec(
+            command=f"{self._agent_path} --version 2>/dev/null || echo 'VERSION_CHECK_FAILED'"
+        )
+        steps = [version_check]
+        if self.INTERACTIVE:
+            steps.append(self._install_runner_scripts(environment))
 
-            await environment.upload_dir(
-                source_dir=self.HOST_CONFIG_DIR,
-                target_dir=self.CONTAINER_CONFIG_DIR,
-            )
+        config_uploaded = self._config_exists()
 
-            # Verify the upload
-            result = await environment.exec(command=f"ls -la {self.CONTAINER_CONFIG_DIR}/")
-            print(f"Config directory contents:\n{result.stdout}")
+        if config_uploaded:
+            print(f"Uploading config from {self.HOST_CONFIG_DIR}")
+            steps.append(self._upload_config(environment))
         else:
             print(f"WARNING: No config found at {self.HOST_CONFIG_DIR}")
             print("Your agent may fail without proper authentication!")
@@ -211,14 +401,161 @@ class MyAgent(BaseInstalledAgent):
             print("  2. Manually create the config directory with required files")
             print(f"  3. Update HOST_CONFIG_DIR in this file to the correct path")
 
-        # ---------------------------------------------------------------------
-        # Step 3: Verify installation (optional but recommended)
-        # ---------------------------------------------------------------------
-        # Run a quick test to make sure everything is working
+        verify, *results = await asyncio.gather(*steps)
 
-        verify = await environment.exec(command=f"{self._agent_path} --version 2>/dev/null || echo 'VERSION_CHECK_FAILED'")
+        if config_uploaded:
+            print(f"Config directory contents:\n{results[-1]}")
         print(f"Agent version check: {verify.stdout.strip()}")
 
+        self._configured_envs[id(environment)] = (environment, self._agent_path)
+
+    async def _locate_agent(self, environment: BaseEnvironment) -> str | None:
+        """
+        Find the agent binary in the container with a single exec call.
+
+        Checks AGENT_SEARCH_PATHS in order, then falls back to 'which'.
+        Every exec is a full container round-trip, so all candidates are
+        tested in one shell command instead of one call per path.
+
+        Returns:
+            The absolute path to the agent binary, or None if not found
+        """
+        candidates = " ".join(self.AGENT_SEARCH_PATHS)
+        result = await environment.exec(
+            command=(
+                f"for p in {candidates}; do [ -x \"$p\" ] && echo \"$p\" && exit 0; done; "
+                "which my-agent || echo 'NOT_FOUND'"
+            )
+        )
+        stdout = (result.stdout or "").strip()
+        path = stdout.splitlines()[0].strip() if stdout else ""
+        return path if path.startswith("/") else None
+
+    async def _install_runner_scripts(self, environment: BaseEnvironment) -> None:
+        """
+        Extract run-agent.sh and run-agent.exp into RUNNER_DIR with one exec call.
+
+        The archive already marks both scripts executable. Raises if the
+        extract fails, rather than letting every task die later on a missing
+        run-agent.sh.
+        """
+        result = await environment.exec(
+            command=f"mkdir -p {self.RUNNER_DIR} && echo '{_RUNNER_TARBALL_B64}' | base64 -d | tar -C {self.RUNNER_DIR} -xzf -"
+        )
+        self._check_upload(result, self.RUNNER_DIR)
+
+    def _build_config_tarball(self) -> bytes:
+        """
+        Pack HOST_CONFIG_DIR into an in-memory gzipped tar archive.
+
+        Compression strips the 10 KiB record padding of a plain tar, so small
+        configs stay well under MAX_INLINE_UPLOAD_BYTES.
+
+        Ownership is reset to root so extracted files are owned by the
+        container user rather than your host UID.
+        """
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode="w:gz") as tar:
+            root = self._tar_info(".", os.stat(self.HOST_CONFIG_DIR))
+            root.type = tarfile.DIRTYPE
+            tar.addfile(root)
+            self._add_tree_to_tar(tar, self.HOST_CONFIG_DIR, ".")
+        return buffer.getvalue()
+
+    def _add_tree_to_tar(self, tar: tarfile.TarFile, path: Path | str, arcname: str) -> None:
+        """
+        Recursively add the contents of a directory to a tar archive.
+
+        Walks with os.scandir so file types come from the directory listing
+        and each entry is stat'ed at most once. tarfile.add() would also look
+        up the owner name and group name of every file, and those lookups are
+        thrown away here anyway.
+        """
+        with os.scandir(path) as entries:
+            for entry in entries:
+                info = self._tar_info(f"{arcname}/{entry.name}", entry.stat(follow_symlinks=False))
+
+                if entry.is_symlink():
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = os.readlink(entry.path)
+                    tar.addfile(info)
+                elif entry.is_dir(follow_symlinks=False):
+                    info.type = tarfile.DIRTYPE
+                    tar.addfile(info)
+                    self._add_tree_to_tar(tar, entry.path, info.name)
+                elif entry.is_file(follow_symlinks=False):
+                    with open(entry.path, "rb") as f:
+                        tar.addfile(info, f)
+                # Sockets, FIFOs and devices are skipped
+
+    @staticmethod
+    def _tar_info(name: str, st: os.stat_result) -> tarfile.TarInfo:
+        """
+        Build a root-owned tar header from an existing stat result.
+        """
+        info = tarfile.TarInfo(name)
+        info.mode = stat.S_IMODE(st.st_mode)
+        info.mtime = int(st.st_mtime)
+        info.size = st.st_size if stat.S_ISREG(st.st_mode) else 0
+        info.uid = info.gid = 0
+        info.uname = info.gname = "root"
+        return info
+
+    async def _upload_config(self, environment: BaseEnvironment) -> str:
+        """
+        Upload HOST_CONFIG_DIR to CONTAINER_CONFIG_DIR as a single tar stream.
+
+        upload_dir copies files one by one, which adds up when the config
+        directory holds many small credential/cache files. Small archives are
+        inlined into one exec call; larger ones are uploaded as one file, since
+        a single command-line argument is capped at 128 KiB on Linux.
+
+        The 'ls -la' listing runs even if the extract fails, so the directory
+        state is always reported; the command still exits with the extract's
+        status.
+
+        Returns:
+            An 'ls -la' listing of the extracted directory, to verify the upload
+        """
+        # Walking and compressing a large config tree is blocking work; keep it
+        # off the event loop so concurrent trials' exec calls are not stalled
+        payload = await asyncio.to_thread(self._build_config_tarball)
+        target = self.CONTAINER_CONFIG_DIR
+        payload_b64 = b2a_base64(payload, newline=False).decode("ascii")
+
+        if len(payload_b64) <= self.MAX_INLINE_UPLOAD_BYTES:
+            result = await environment.exec(
+                command=f"mkdir -p {target} && echo '{payload_b64}' | base64 -d | tar -C {target} -xzf -; status=$?; ls -la {target}/; exit $status"
+            )
+            self._check_upload(result, target)
+            return result.stdout
+
+        remote_tar = "/tmp/my-agent-config.tar.gz"
+        with tempfile.NamedTemporaryFile(suffix=".tar.gz") as local_tar:
+            local_tar.write(payload)
+            local_tar.flush()
+            await environment.upload_file(source_path=local_tar.name, target_path=remote_tar)
+        result = await environment.exec(
+            command=f"mkdir -p {target} && tar -C {target} -xzf {remote_tar}; status=$?; rm -f {remote_tar}; ls -la {target}/; exit $status"
+        )
+        self._check_upload(result, target)
+        return result.stdout
+
+    @staticmethod
+    def _check_upload(result, target: str) -> None:
+        """
+        Raise if an upload/extract exec call failed.
+
+        A silent failure would leave the task running without credentials
+        or runner scripts, far from the actual cause.
+        """
+        if result.return_code != 0:
+            raise RuntimeError(
+                f"Upload to {target} failed (exit code {result.return_code}):\n"
+                f"{result.stderr}\n"
+                f"Directory contents:\n{result.stdout}"
+            )
+
     # =========================================================================
     # EXECUTION PHASE - Called for each task
     # =========================================================================
@@ -240,7 +577,8 @@ class MyAgent(BaseInstalledAgent):
             Most agents only need one command.
 
         TIPS:
-        - Encode the instruction in base64 to avoid shell escaping issues
+        - Pass the instruction through a quoted heredoc or base64 to avoid
+          shell escaping issues
         - Use 'expect' for agents that need a PTY (pseudo-terminal)
         - Set appropriate timeouts (most tasks should complete in 10-15 minutes)
         - The working directory is /app by default
@@ -251,127 +589,58 @@ class MyAgent(BaseInstalledAgent):
            return [ExecInput(command=f"my-agent '{instruction}'", timeout_sec=900)]
 
         2. Base64 encoding (recommended for complex instructions):
-           encoded = base64.b64encode(instruction.encode()).decode()
+           encoded = b2a_base64(instruction.encode(), newline=False).decode("ascii")
            cmd = f"echo '{encoded}' | base64 -d | my-agent"
            return [ExecInput(command=cmd, timeout_sec=900)]
 
         3. Using expect for interactive agents (see example below)
         """
 
-        # Encode instruction as base64 to avoid shell escaping issues
-        # This handles quotes, special characters, and multi-line instructions
-        instruction_b64 = base64.b64encode(instruction.encode()).decode()
+        # The instruction is sent raw inside a quoted heredoc, which handles
+        # quotes, special characters, and multi-line instructions. Pick a
+        # delimiter that cannot appear in the instruction itself.
+        delimiter = "INSTRUCTION_EOF"
+        while delimiter in instruction:
+            delimiter += "_"
 
         # Get the agent path (set during setup)
         agent_path = getattr(self, '_agent_path', '/usr/local/bin/my-agent')
 
+        template_args = {
+            "instruction_file": self.INSTRUCTION_FILE,
+            "delimiter": delimiter,
+            "instruction": instruction,
+            "agent": agent_path,
+            "runner_dir": self.RUNNER_DIR,
+        }
+
         # ---------------------------------------------------------------------
-        # Option A: Simple command execution
+        # Option A: Simple command execution (INTERACTIVE = False)
         # ---------------------------------------------------------------------
-        # Use this if your agent doesn't need interactive input
-
-        # simple_command = f'''
-        # INSTRUCTION=$(echo "{instruction_b64}" | base64 -d)
-        # cd /app
-        # {agent_path} --auto "$INSTRUCTION"
-        # '''
+        # Use this if your agent doesn't need interactive input. Skips
+        # spawning expect, allocating a PTY, and scanning every byte of output.
+
+        if not self.INTERACTIVE:
+            return [
+                ExecInput(
+                    command=self._DIRECT_CMD_TEMPLATE.format(**template_args),
+                    cwd="/",
+                    timeout_sec=900,  # 15 minutes - adjust based on your agent
+                ),
+            ]
 
         # ---------------------------------------------------------------------
-        # Option B: Using expect for interactive agents (RECOMMENDED)
+        # Option B: Using expect for interactive agents (INTERACTIVE = True)
         # ---------------------------------------------------------------------
-        # Many AI agents have interactive prompts. Use 'expect' to:
-        # - Provide a pseudo-terminal (PTY)
-        # - Auto-accept confirmation prompts
-        # - Detect task completion
-        # - Handle timeouts gracefully
-
-        script_content = f'''#!/bin/bash
-# Decode the task instruction
-INSTRUCTION=$(echo "{instruction_b64}" | base64 -d)
-echo "=== Task Instruction ==="
-echo "$INSTRUCTION"
-echo "========================"
-
-cd /app
-
-# Use expect to handle interactive prompts
-cat > /tmp/run-agent.exp << 'EXPECT_EOF'
-#!/usr/bin/expect -f
-
-# Set timeout (25 minutes - adjust as needed)
-set timeout 1500
-log_user 1
-
-# Get arguments passed to this script
-set agent_bin [lindex $argv 0]
-set instruction [lindex $argv 1]
-
-# Track completion
-set task_done 0
-
-# Start the agent
-spawn $agent_bin "$instruction"
-
-# Main interaction loop
-expect {{
-    # Auto-accept "yes/no" prompts
-    -re "\\[Y/n\\]|\\[y/N\\]|\\(yes/no\\)" {{
-        send "y\\r"
-        exp_continue
-    }}
-
-    # Auto-accept numbered choice prompts (select first option)
-    -re "1\\. Yes|1\\. Continue|1\\. Accept" {{
-        sleep 0.3
-        send "\\r"
-        exp_continue
-    }}
-
-    # Detect completion messages
-    -re "Done|Completed|Finished|Success" {{
-        set task_done 1
-        sleep 2
-        send "\\x03"
-        exp_continue
-    }}
-
-    # Handle end of output
-    eof {{
-        catch wait result
-        set exit_code [lindex $result 3]
-        if {{$task_done}} {{
-            exit 0
-        }}
-        exit $exit_code
-    }}
-
-    # Handle timeout
-    timeout {{
-        puts "\\n=== Timeout ==="
-        if {{$task_done}} {{
-            exit 0
-        }}
-        exit 124
-    }}
-}}
-EXPECT_EOF
-
-chmod +x /tmp/run-agent.exp
-
-# Run the expect script
-/tmp/run-agent.exp "{agent_path}" "$INSTRUCTION" 2>&1
-EXIT_CODE=$?
-
-echo "=== Agent exited with code: $EXIT_CODE ==="
-exit $EXIT_CODE
-'''
-
-        # Encode the entire script as base64 to avoid escaping issues
-        script_b64 = base64.b64encode(script_content.encode()).decode()
-
+        # Many AI agents have interactive prompts. Use 'expect' (see
+        # _EXPECT_SCRIPT above) to provide a PTY and answer them.
+        #
+        # The runner scripts are installed once during setup(). The instruction
+        # is written to a file once and read back by the runner, with no
+        # encoding layers in between.
         return [
             ExecInput(
-                command=f"echo '{script_b64}' | base64 -d > /tmp/run-agent.sh && chmod +x /tmp/run-agent.sh && /tmp/run-agent.sh",
+                command=self._CMD_TEMPLATE.format(**template_args),
                 cwd="/",
                 timeout_sec=1500,  # 25 minutes - adjust based on your agent
             ),
@@ -402,16 +671,24 @@ exit $EXIT_CODE
         # Read the output file
         output_file = self.logs_dir / "command-0" / "stdout.txt"
 
-        if output_file.exists():
-            output = output_file.read_text()
-            context.metadata["output_length"] = len(output)
-
-            # Add any other metadata you want to track
-            # Examples:
-            # context.metadata["lines"] = output.count("\n")
-            # context.metadata["has_error"] = "error" in output.lower()
-        else:
-            context.metadata["output_length"] = 0
+        context.metadata["output_length"] = 0
+        context.metadata["lines"] = 0
+        context.metadata["has_error"] = False
+
+        # Scan the raw bytes through mmap rather than decoding multi-MB
+        # transcripts into a str. mmap cannot map an empty file.
+        if output_file.exists() and output_file.stat().st_size > 0:
+            with output_file.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                context.metadata["output_length"] = len(mm)
+                # mmap has no count(), so count newlines in 64 KiB slices
+                context.metadata["lines"] = sum(
+                    mm[i:i + 65536].count(b"\n") for i in range(0, len(mm), 65536)
+                )
+                context.metadata["has_error"] = _ERROR_PATTERN.search(mm) is not None
+
+                # Add any other metadata you want to track
+                # Example:
+                # context.metadata["timed_out"] = mm.find(b"=== Timeout ===") != -1
 
 
 # =============================================================================